@@ -0,0 +1,202 @@
+import math
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+from sqlalchemy import event, func, text
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models import Product, ShoppingListItem
+
+RANKED_CACHE_MIN_RANGE = 64
+CATALOG_CHECK_SECONDS = 5
+POPULARITY_REFRESH_SECONDS = 300
+
+# Contador que SQLite incrementa con cualquier cambio en products, venga de
+# este proceso, de load_data.py o de SQL directo
+CATALOG_VERSION_DDL = [
+    "CREATE TABLE IF NOT EXISTS catalog_version (id INTEGER PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)",
+    "INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0)",
+] + [
+    f"CREATE TRIGGER IF NOT EXISTS products_catalog_version_{operation.lower()} "
+    f"AFTER {operation} ON products "
+    "BEGIN UPDATE catalog_version SET version = version + 1 WHERE id = 1; END"
+    for operation in ("INSERT", "UPDATE", "DELETE")
+]
+
+
+@lru_cache(maxsize=65536)
+def _fold_word(word):
+    if word.isascii():
+        return word.casefold()
+    decomposed = unicodedata.normalize("NFKD", word)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def fold(text):
+    if not text:
+        return ""
+    return " ".join(_fold_word(word) for word in text.split())
+
+
+def suggestion_weight(sustainability_score, times_listed):
+    return (sustainability_score or 0) + 10 * math.log1p(times_listed)
+
+
+class PrefixIndex:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+        self._catalog_version = None
+        self._built_at = 0
+        self._next_check = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._data = None
+
+    # Los cambios de otros procesos no pasan por los eventos de esta sesión
+    def catalog_version(self, db):
+        return db.execute(text("SELECT version FROM catalog_version WHERE id = 1")).scalar()
+
+    def _is_stale(self):
+        if time.monotonic() - self._built_at >= POPULARITY_REFRESH_SECONDS:
+            return True
+
+        db = SessionLocal()
+        try:
+            return self.catalog_version(db) != self._catalog_version
+        finally:
+            db.close()
+
+    def _rebuild(self):
+        self._data, self._catalog_version = self.build()
+        self._built_at = time.monotonic()
+        self._next_check = self._built_at + CATALOG_CHECK_SECONDS
+
+    def build(self):
+        db = SessionLocal()
+
+        try:
+            version = self.catalog_version(db)
+            popularity = dict(
+                db.query(ShoppingListItem.product_id, func.count(ShoppingListItem.id))
+                .group_by(ShoppingListItem.product_id)
+                .all()
+            )
+            rows = db.query(Product.id, Product.name, Product.brand, Product.sustainability_score).all()
+        finally:
+            db.close()
+
+        labels = {}
+        weights = {}
+        entries = []
+        for product_id, name, brand, score in rows:
+            labels[product_id] = name
+            weights[product_id] = suggestion_weight(score, popularity.get(product_id, 0))
+            for word in set(fold(f"{name} {brand or ''}").split()):
+                entries.append((word, product_id))
+
+        entries.sort()
+        keys = [word for word, _ in entries]
+        ids = [product_id for _, product_id in entries]
+
+        # Los rankings y conjuntos por prefijo se llenan a medida que se consultan
+        return (keys, ids, {}, {}, labels, weights), version
+
+    @staticmethod
+    def _range(keys, prefix):
+        start = bisect_left(keys, prefix)
+        return start, bisect_left(keys, prefix + "\uffff", start)
+
+    @staticmethod
+    def _rank(product_ids, weights):
+        return sorted(set(product_ids), key=lambda i: (-weights[i], i))
+
+    def _current(self):
+        # Solo un hilo revisa el catálogo; el resto sigue con el índice actual
+        if time.monotonic() >= self._next_check and self._data is not None and self._lock.acquire(blocking=False):
+            try:
+                if self._data is not None and self._is_stale():
+                    self._rebuild()
+                self._next_check = time.monotonic() + CATALOG_CHECK_SECONDS
+            finally:
+                self._lock.release()
+
+        data = self._data
+        if data is None:
+            with self._lock:
+                if self._data is None:
+                    self._rebuild()
+                data = self._data
+        return data
+
+    def suggest(self, query, limit=8):
+        tokens = set(fold(query).split())
+        if not tokens or limit <= 0:
+            return []
+
+        keys, ids, ranked, members, labels, weights = self._current()
+
+        # Se recorre el token con menos coincidencias y el resto se verifica
+        ranges = [(self._range(keys, t), t) for t in tokens]
+        ranges.sort(key=lambda r: (r[0][1] - r[0][0], r[1]))
+        (start, end), driver = ranges[0]
+        if start == end:
+            return []
+
+        candidates = ranked.get(driver)
+        if candidates is None:
+            candidates = self._rank(ids[start:end], weights)
+            if end - start >= RANKED_CACHE_MIN_RANGE:
+                ranked[driver] = candidates
+
+        others = []
+        for (other_start, other_end), token in ranges[1:]:
+            matches = members.get(token)
+            if matches is None:
+                matches = set(ids[other_start:other_end])
+                if other_end - other_start >= RANKED_CACHE_MIN_RANGE:
+                    members[token] = matches
+            others.append(matches)
+
+        best = []
+        for i in candidates:
+            if others and not all(i in matches for matches in others):
+                continue
+            best.append(i)
+            if len(best) == limit:
+                break
+
+        return [{"id": i, "label": labels[i]} for i in best]
+
+
+product_index = PrefixIndex()
+
+
+# Los cambios hechos en este proceso invalidan el índice de inmediato
+@event.listens_for(Session, "after_flush")
+def mark_catalog_changes(session, flush_context):
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(instance, Product):
+            session.info["catalog_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_on_commit(session):
+    if session.info.pop("catalog_changed", False):
+        product_index.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_on_rollback(session):
+    session.info.pop("catalog_changed", None)
+
+
+def install_catalog_version(engine):
+    with engine.begin() as connection:
+        for statement in CATALOG_VERSION_DDL:
+            connection.execute(text(statement))
@@ -1,7 +1,11 @@
+import time
+from bisect import bisect_right
 
 
 def product_value(product):
     sustainability = product.get('sustainability_score', 50)
+    if sustainability is None:
+        sustainability = 0
     price = product.get('price',1)
 
     if price > 0:
@@ -11,39 +15,35 @@ def product_value(product):
 
     return value
 
-def product_optimizer(products, budget):
-    selected = []
+def _greedy_counts(sorted_products, budget):
+    counts = []
     total_price = 0
-    
-    if not products or len(products) == 0 or budget == 0:
-        return {
-            'selected_products': [],
-            'total_price': 0,
-            'total_items': 0,
-            'avg_sustainability': 0,
-            'budget_used_percentage': 0
-        }
-    for product in products:
-        product['value'] = product_value(product)
-
-    sorted_products = sorted(products, key= lambda p: p['value'], reverse= True)
 
     for product in sorted_products:
         price = product.get('price',0)
-
-        if total_price + price <= budget:
-            selected.append(product)
-            total_price += price
+        units = product.get('quantity') or 1
 
         if total_price == budget:
-            break
-    
-    number_items = len(selected)
+            count = 0
+        elif price > 0:
+            count = min(units, int((budget - total_price + 1e-9) // price))
+        else:
+            count = units
+
+        counts.append(count)
+        total_price += price * count
+
+    return counts
+
+
+def _optimization_summary(selected, budget):
+    total_price = sum(p['price'] * p['quantity'] for p in selected)
+    number_items = sum(p['quantity'] for p in selected)
 
     if number_items > 0:
         aux_sum = 0
         for p in selected:
-            aux_sum += p.get('sustainability_score',0)
+            aux_sum += (p.get('sustainability_score') or 0) * p['quantity']
         avg_sust = aux_sum/number_items
     else:
         avg_sust = 0
@@ -55,4 +55,148 @@ def product_optimizer(products, budget):
         'total_items': number_items,
         'avg_sustainability': round(avg_sust,1),
         'budget_used_percentage': round(budget_used,1)
-    }
\ No newline at end of file
+    }
+
+
+def product_optimizer(products, budget):
+    if not products or len(products) == 0 or budget == 0:
+        return {
+            'selected_products': [],
+            'total_price': 0,
+            'total_items': 0,
+            'avg_sustainability': 0,
+            'budget_used_percentage': 0
+        }
+    for product in products:
+        product['value'] = product_value(product)
+
+    sorted_products = sorted(products, key= lambda p: p['value'], reverse= True)
+    counts = _greedy_counts(sorted_products, budget)
+
+    selected = [
+        dict(product, quantity=count)
+        for product, count in zip(sorted_products, counts)
+        if count > 0
+    ]
+
+    return _optimization_summary(selected, budget)
+
+
+# Cota de la mochila fraccionaria usando sumas acumuladas de precio y puntaje
+def _fractional_bound(items, prefix_price, prefix_score, index, capacity, value):
+    limit = prefix_price[index] + capacity
+    last = bisect_right(prefix_price, limit, index) - 1
+    value += prefix_score[last] - prefix_score[index]
+
+    if last < len(items):
+        price, score, units = items[last]
+        value += (limit - prefix_price[last]) / price * score
+
+    return value
+
+
+def product_optimizer_anytime(products, budget, deadline_ms=200):
+    start = time.perf_counter()
+    deadline = start + deadline_ms / 1000
+
+    if not products or len(products) == 0 or not budget:
+        return {
+            'selected_products': [],
+            'total_price': 0,
+            'total_items': 0,
+            'avg_sustainability': 0,
+            'budget_used_percentage': 0,
+            'optimality_gap': 0,
+            'nodes_explored': 0,
+            'is_optimal': True
+        }
+
+    for product in products:
+        product['value'] = product_value(product)
+
+    # La búsqueda parte de la misma solución greedy que product_optimizer
+    sorted_products = sorted(products, key= lambda p: p['value'], reverse= True)
+    greedy_counts = _greedy_counts(sorted_products, budget)
+
+    # Los productos gratis o sin puntaje no cambian la búsqueda
+    free = [p for p in sorted_products if p.get('price', 0) <= 0]
+    candidates = []
+    best_counts = []
+    for product, count in zip(sorted_products, greedy_counts):
+        if product.get('price', 0) > 0 and (product.get('sustainability_score') or 0) > 0:
+            candidates.append(product)
+            best_counts.append(count)
+
+    items = [
+        (p['price'], p.get('sustainability_score') or 0, p.get('quantity') or 1)
+        for p in candidates
+    ]
+    n = len(items)
+
+    prefix_price = [0]
+    prefix_score = [0]
+    for price, score, units in items:
+        prefix_price.append(prefix_price[-1] + price * units)
+        prefix_score.append(prefix_score[-1] + score * units)
+
+    best_value = sum(count * item[1] for item, count in zip(items, best_counts))
+
+    # Nodos: (bound, index, capacity, value, decisiones como lista enlazada)
+    stack = [(_fractional_bound(items, prefix_price, prefix_score, 0, budget, 0), 0, budget, 0, None)]
+    nodes = 0
+    work = 0
+    # La preparación cuenta contra el plazo; si ya se agotó queda la solución greedy
+    timed_out = time.perf_counter() >= deadline
+    # Cota del nodo que se estaba expandiendo si el plazo vence a mitad de camino
+    interrupted_bound = 0
+
+    while stack and not timed_out:
+        nodes += 1
+        bound, index, capacity, value, chosen = stack.pop()
+        if bound <= best_value + 1e-9:
+            continue
+
+        if index == n:
+            best_value = value
+            best_counts = [0] * n
+            while chosen is not None:
+                i, count, chosen = chosen
+                best_counts[i] = count
+            continue
+
+        price, score, units = items[index]
+        max_count = min(units, int((capacity + 1e-9) // price))
+        for count in range(max_count + 1):
+            work += 1
+            if work % 16 == 0 and time.perf_counter() >= deadline:
+                timed_out = True
+                interrupted_bound = bound
+                break
+
+            child_capacity = capacity - count * price
+            child_value = value + count * score
+            child_bound = _fractional_bound(items, prefix_price, prefix_score, index + 1, child_capacity, child_value)
+            if child_bound > best_value + 1e-9:
+                child_chosen = (index, count, chosen) if count else chosen
+                stack.append((child_bound, index + 1, child_capacity, child_value, child_chosen))
+
+    upper_bound = best_value
+    if timed_out:
+        upper_bound = max([best_value, interrupted_bound] + [node[0] for node in stack])
+
+    selected = [dict(p, quantity=p.get('quantity') or 1) for p in free]
+    for product, count in zip(candidates, best_counts):
+        if count > 0:
+            selected.append(dict(product, quantity=count))
+
+    if upper_bound > 0:
+        gap = (upper_bound - best_value) / upper_bound * 100
+    else:
+        gap = 0
+
+    result = _optimization_summary(selected, budget)
+    result['optimality_gap'] = round(gap,2)
+    result['nodes_explored'] = nodes
+    result['is_optimal'] = not timed_out
+
+    return result
@@ -0,0 +1,140 @@
+from sqlalchemy import event, func, inspect, select, text, update
+from sqlalchemy.orm import Session
+from .models import Product, ShoppingList, ShoppingListItem
+
+TOTAL_COLUMNS = {
+    "total_price": "FLOAT DEFAULT 0",
+    "total_quantity": "INTEGER DEFAULT 0",
+    "sustainability_sum": "FLOAT DEFAULT 0",
+}
+
+
+# Los incrementos se escriben como expresiones SQL para que las
+# peticiones concurrentes no se pisen entre sí
+def apply_item_delta(shopping_list, product, quantity):
+    shopping_list.total_price = func.coalesce(ShoppingList.total_price, 0) + product.price * quantity
+    shopping_list.total_quantity = func.coalesce(ShoppingList.total_quantity, 0) + quantity
+    shopping_list.sustainability_sum = (
+        func.coalesce(ShoppingList.sustainability_sum, 0) + (product.sustainability_score or 0) * quantity
+    )
+
+
+def reset_list_totals(shopping_list):
+    shopping_list.total_price = 0
+    shopping_list.total_quantity = 0
+    shopping_list.sustainability_sum = 0
+
+
+def _item_sum(expression):
+    return (
+        select(func.coalesce(func.sum(expression), 0))
+        .select_from(ShoppingListItem)
+        .join(Product, ShoppingListItem.product_id == Product.id)
+        .where(ShoppingListItem.shopping_list_id == ShoppingList.id)
+        .scalar_subquery()
+    )
+
+
+def recompute_list_totals(connection, list_id=None):
+    statement = update(ShoppingList.__table__).values(
+        total_price=_item_sum(ShoppingListItem.quantity * Product.price),
+        total_quantity=_item_sum(ShoppingListItem.quantity),
+        sustainability_sum=_item_sum(
+            ShoppingListItem.quantity * func.coalesce(Product.sustainability_score, 0)
+        )
+    )
+
+    if list_id is not None:
+        statement = statement.where(ShoppingList.id == list_id)
+
+    connection.execute(statement)
+
+
+def migrate_list_totals(engine):
+    existing = {c["name"] for c in inspect(engine).get_columns("shopping_lists")}
+    missing = [name for name in TOTAL_COLUMNS if name not in existing]
+    if not missing:
+        return
+
+    with engine.begin() as connection:
+        for name in missing:
+            connection.execute(text(f"ALTER TABLE shopping_lists ADD COLUMN {name} {TOTAL_COLUMNS[name]}"))
+        recompute_list_totals(connection)
+
+
+def list_summary(shopping_list):
+    total_quantity = shopping_list.total_quantity or 0
+
+    if total_quantity > 0:
+        avg_sust = (shopping_list.sustainability_sum or 0) / total_quantity
+    else:
+        avg_sust = 0
+
+    return {
+        "total_price": round(shopping_list.total_price or 0, 2),
+        "total_items": total_quantity,
+        "avg_sustainability": round(avg_sust, 1)
+    }
+
+
+def _delta(state, attribute):
+    history = state.attrs[attribute].history
+    if not history.has_changes():
+        return 0
+    old = history.deleted[0] if history.deleted else None
+    new = history.added[0] if history.added else None
+    return (new or 0) - (old or 0)
+
+
+def _list_quantity(product_id):
+    return (
+        select(func.coalesce(func.sum(ShoppingListItem.quantity), 0))
+        .where(
+            ShoppingListItem.shopping_list_id == ShoppingList.id,
+            ShoppingListItem.product_id == product_id
+        )
+        .scalar_subquery()
+    )
+
+
+def _shift_lists_with_product(session, product_id, price_delta, score_delta, quantity_sign=0):
+    quantity = _list_quantity(product_id)
+    statement = update(ShoppingList.__table__).where(
+        ShoppingList.id.in_(
+            select(ShoppingListItem.shopping_list_id).where(
+                ShoppingListItem.product_id == product_id
+            )
+        )
+    ).values(
+        total_price=func.coalesce(ShoppingList.total_price, 0) + price_delta * quantity,
+        total_quantity=func.coalesce(ShoppingList.total_quantity, 0) + quantity_sign * quantity,
+        sustainability_sum=func.coalesce(ShoppingList.sustainability_sum, 0) + score_delta * quantity
+    )
+    session.connection().execute(statement)
+
+
+# Cuando cambia el precio o el puntaje de un producto, o se borra, se ajustan
+# los totales de las listas que lo contienen en la misma transacción.
+# Los cambios masivos (como load_data.py) deben llamar a recompute_list_totals
+@event.listens_for(Session, "before_flush")
+def reconcile_product_changes(session, flush_context, instances):
+    for product in list(session.dirty):
+        if not isinstance(product, Product):
+            continue
+
+        state = inspect(product)
+        price_delta = _delta(state, "price")
+        score_delta = _delta(state, "sustainability_score")
+        if price_delta or score_delta:
+            _shift_lists_with_product(session, product.id, price_delta, score_delta)
+
+    # Los items de un producto borrado dejan de aparecer en las listas,
+    # así que también se descuentan sus unidades
+    for product in list(session.deleted):
+        if not isinstance(product, Product):
+            continue
+
+        with session.no_autoflush:
+            price = product.price or 0
+            score = product.sustainability_score or 0
+        _shift_lists_with_product(session, product.id, -price, -score, -1)
@@ -1,12 +1,18 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Optional
 from .database import get_db, Base, engine
 from .models import Product, ShoppingList, ShoppingListItem
-from .algorithms.optimizer import product_optimizer
+from .list_totals import apply_item_delta, reset_list_totals, recompute_list_totals, migrate_list_totals, list_summary
+from .queries import search_product_rows, listing_product_rows, list_item_rows, optimizer_product_rows
+from .algorithms.autocomplete import product_index, install_catalog_version
+from .algorithms.optimizer import product_optimizer, product_optimizer_anytime
 
 Base.metadata.create_all(bind=engine)
+migrate_list_totals(engine)
+install_catalog_version(engine)
 
 app = FastAPI(title="LiquiVerde API")
 
@@ -30,6 +36,7 @@ class AddItemRequest(BaseModel):
 
 class OptimizeRequest(BaseModel):
     budget: float
+    deadline_ms: Optional[int] = Field(None, gt=0)
 
 
 @app.get("/")
@@ -39,33 +46,24 @@ def read_root():
 
 @app.get("/products/search")
 def search_products(q: str = "", db: Session = Depends(get_db)):
-    products = db.query(Product).filter(
-        (Product.name.ilike(f"%{q}%")) | 
-        (Product.brand.ilike(f"%{q}%")) |
-        (Product.category.ilike(f"%{q}%"))
-    ).limit(20).all()
+    products = search_product_rows(db, q, 20)
     
     return {
-        "results": [
-            {
-                "id": p.id,
-                "barcode": p.barcode,
-                "name": p.name,
-                "brand": p.brand,
-                "category": p.category,
-                "price": p.price,
-                "unit": p.unit,
-                "sustainability_score": p.sustainability_score,
-                "nutriscore": p.nutriscore,
-                "ecoscore": p.ecoscore,
-                "is_local": p.is_local
-            }
-            for p in products
-        ],
+        "results": products,
         "count": len(products)
     }
 
 
+@app.get("/products/autocomplete")
+def autocomplete_products(q: str = "", limit: int = 8):
+    suggestions = product_index.suggest(q, min(limit, 20))
+    
+    return {
+        "suggestions": suggestions,
+        "count": len(suggestions)
+    }
+
+
 @app.get("/products/{product_id}")
 def get_product(product_id: int, db: Session = Depends(get_db)):
     product = db.query(Product).filter(Product.id == product_id).first()
@@ -98,25 +96,10 @@ def get_all_products(
     limit: int = 50,
     db: Session = Depends(get_db)
 ):
-    query = db.query(Product)
-    
-    if category:
-        query = query.filter(Product.category == category)
-    
-    products = query.limit(limit).all()
+    products = listing_product_rows(db, category, limit)
     
     return {
-        "results": [
-            {
-                "id": p.id,
-                "name": p.name,
-                "brand": p.brand,
-                "category": p.category,
-                "price": p.price,
-                "sustainability_score": p.sustainability_score
-            }
-            for p in products
-        ],
+        "results": products,
         "count": len(products)
     }
 
@@ -151,28 +134,31 @@ def get_shopping_list(list_id: int, db: Session = Depends(get_db)):
     if not shopping_list:
         return {"error": "Lista no encontrada"}
     
-    items = []
-    for item in shopping_list.items:
-        items.append({
-            "id": item.id,
-            "product_id": item.product_id,
-            "quantity": item.quantity,
-            "product": {
-                "id": item.product.id,
-                "name": item.product.name,
-                "brand": item.product.brand,
-                "price": item.product.price,
-                "sustainability_score": item.product.sustainability_score,
-                "unit": item.product.unit
-            }
-        })
+    items = list_item_rows(db, list_id)
     
     return {
         "id": shopping_list.id,
         "name": shopping_list.name,
         "budget": shopping_list.budget,
         "is_optimized": shopping_list.is_optimized,
-        "items": items
+        "items": items,
+        **list_summary(shopping_list)
+    }
+
+
+@app.get("/shopping-lists/{list_id}/summary")
+def get_shopping_list_summary(list_id: int, db: Session = Depends(get_db)):
+    shopping_list = db.query(ShoppingList).filter(ShoppingList.id == list_id).first()
+    
+    if not shopping_list:
+        return {"error": "Lista no encontrada"}
+    
+    return {
+        "id": shopping_list.id,
+        "name": shopping_list.name,
+        "budget": shopping_list.budget,
+        "is_optimized": shopping_list.is_optimized,
+        **list_summary(shopping_list)
     }
 
 
@@ -195,8 +181,10 @@ def add_item_to_list(
         ShoppingListItem.product_id == item_data.product_id
     ).first()
     
+    apply_item_delta(shopping_list, product, item_data.quantity)
+
     if existing_item:
-        existing_item.quantity += item_data.quantity
+        existing_item.quantity = ShoppingListItem.quantity + item_data.quantity
         db.commit()
         return {"message": "Cantidad actualizada", "item_id": existing_item.id}
     else:
@@ -225,7 +213,16 @@ def remove_item_from_list(
     if not item:
         return {"error": "Item no encontrado"}
     
+    product = item.product
     db.delete(item)
+    
+    # Si el producto ya no existe no se conoce su precio, así que se recalcula
+    if product is not None:
+        apply_item_delta(item.shopping_list, product, -item.quantity)
+    else:
+        db.flush()
+        recompute_list_totals(db.connection(), list_id)
+    
     db.commit()
     
     return {"message": "Producto eliminado"}
@@ -241,27 +238,15 @@ def optimize_list(
     if not shopping_list:
         return {"error": "Lista no encontrada"}
     
-    items = db.query(ShoppingListItem).filter(
-        ShoppingListItem.shopping_list_id == list_id
-    ).all()
+    products = optimizer_product_rows(db, list_id)
     
-    if not items:
+    if not products:
         return {"error": "La lista está vacía"}
     
-    products = []
-    for item in items:
-        product = item.product
-        products.append({
-            'id': product.id,
-            'name': product.name,
-            'brand': product.brand,
-            'price': product.price,
-            'sustainability_score': product.sustainability_score,
-            'category': product.category,
-            'unit': product.unit
-        })
-    
-    result = product_optimizer(products, optimize_data.budget)
+    if optimize_data.deadline_ms:
+        result = product_optimizer_anytime(products, optimize_data.budget, optimize_data.deadline_ms)
+    else:
+        result = product_optimizer(products, optimize_data.budget)
     
     shopping_list.is_optimized = True
     shopping_list.budget = optimize_data.budget
@@ -309,6 +294,7 @@ def clear_shopping_list(list_id: int, db: Session = Depends(get_db)):
     db.query(ShoppingListItem).filter(
         ShoppingListItem.shopping_list_id == list_id
     ).delete()
+    reset_list_totals(shopping_list)
     
     db.commit()
     
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, Float, Boolean, Text, ForeignKey, DateTime
-from  sqlalchemy.orm import relationship
+from  sqlalchemy.orm import relationship, column_property
 from .database import Base
 from datetime import datetime, timezone
 
@@ -12,11 +12,11 @@ class Product(Base):
     brand = Column(String)
     category = Column(String, index=True)
     subcategory = Column(String, nullable=True)
-    price = Column(Float, nullable=False)
+    price = column_property(Column(Float, nullable=False), active_history=True)
     unit = Column(String)
     nutriscore = Column(String)
     ecoscore = Column(String, nullable=True)
-    sustainability_score = Column(Float)
+    sustainability_score = column_property(Column(Float), active_history=True)
     carbon_footprint = Column(Float, nullable=True)
     is_local = Column(Boolean, default=False)
     is_organic = Column(Boolean, default=False)
@@ -34,6 +34,9 @@ class ShoppingList(Base):
     budget = Column(Float, nullable=True)
     created_at = Column(DateTime, default= lambda: datetime.now(timezone.utc))
     is_optimized = Column(Boolean, default=False)
+    total_price = Column(Float, default=0)
+    total_quantity = Column(Integer, default=0)
+    sustainability_sum = Column(Float, default=0)
     items = relationship("ShoppingListItem", back_populates= "shopping_list", cascade = "all, delete-orphan")
 
 
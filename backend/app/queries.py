@@ -0,0 +1,77 @@
+from sqlalchemy import select
+from .models import Product, ShoppingListItem
+
+SEARCH_COLUMNS = (
+    Product.id, Product.barcode, Product.name, Product.brand, Product.category,
+    Product.price, Product.unit, Product.sustainability_score, Product.nutriscore,
+    Product.ecoscore, Product.is_local
+)
+
+LISTING_COLUMNS = (
+    Product.id, Product.name, Product.brand, Product.category,
+    Product.price, Product.sustainability_score
+)
+
+ITEM_PRODUCT_COLUMNS = (
+    Product.id, Product.name, Product.brand, Product.price,
+    Product.sustainability_score, Product.unit
+)
+
+OPTIMIZER_COLUMNS = (
+    Product.id, Product.name, Product.brand, Product.price,
+    Product.sustainability_score, Product.category, Product.unit
+)
+
+SEARCH_KEYS = tuple(c.key for c in SEARCH_COLUMNS)
+LISTING_KEYS = tuple(c.key for c in LISTING_COLUMNS)
+ITEM_PRODUCT_KEYS = tuple(c.key for c in ITEM_PRODUCT_COLUMNS)
+OPTIMIZER_KEYS = tuple(c.key for c in OPTIMIZER_COLUMNS) + ('quantity',)
+
+
+# Se leen solo las columnas necesarias como tuplas, sin construir entidades ORM
+def search_product_rows(db, q, limit=20):
+    statement = select(*SEARCH_COLUMNS).where(
+        (Product.name.ilike(f"%{q}%")) |
+        (Product.brand.ilike(f"%{q}%")) |
+        (Product.category.ilike(f"%{q}%"))
+    ).limit(limit)
+
+    return [dict(zip(SEARCH_KEYS, row)) for row in db.execute(statement)]
+
+
+def listing_product_rows(db, category=None, limit=50):
+    statement = select(*LISTING_COLUMNS)
+
+    if category:
+        statement = statement.where(Product.category == category)
+
+    return [dict(zip(LISTING_KEYS, row)) for row in db.execute(statement.limit(limit))]
+
+
+def list_item_rows(db, list_id):
+    statement = select(
+        ShoppingListItem.id, ShoppingListItem.product_id, ShoppingListItem.quantity,
+        *ITEM_PRODUCT_COLUMNS
+    ).join(Product, ShoppingListItem.product_id == Product.id).where(
+        ShoppingListItem.shopping_list_id == list_id
+    ).order_by(ShoppingListItem.id)
+
+    return [
+        {
+            "id": row[0],
+            "product_id": row[1],
+            "quantity": row[2],
+            "product": dict(zip(ITEM_PRODUCT_KEYS, row[3:]))
+        }
+        for row in db.execute(statement)
+    ]
+
+
+def optimizer_product_rows(db, list_id):
+    statement = select(*OPTIMIZER_COLUMNS, ShoppingListItem.quantity).join(
+        ShoppingListItem, ShoppingListItem.product_id == Product.id
+    ).where(
+        ShoppingListItem.shopping_list_id == list_id
+    ).order_by(ShoppingListItem.id)
+
+    return [dict(zip(OPTIMIZER_KEYS, row)) for row in db.execute(statement)]
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 from .database import get_db
 from .models import ShoppingList, ShoppingListItem, Product
-from .algorithms.optimizer import product_optimizer
+from .list_totals import apply_item_delta, recompute_list_totals, list_summary
+from .queries import list_item_rows, optimizer_product_rows
+from .algorithms.optimizer import product_optimizer, product_optimizer_anytime
 
 
 class ShoppingListCreate(BaseModel):
@@ -19,6 +21,7 @@ class AddItemRequest(BaseModel):
 
 class OptimizeRequest(BaseModel):
     budget: float
+    deadline_ms: Optional[int] = Field(None, gt=0)
 
 
 class ProductResponse(BaseModel):
@@ -47,6 +50,9 @@ class ShoppingListResponse(BaseModel):
     name: str
     budget: float = None
     is_optimized: bool
+    total_price: float = 0
+    total_items: int = 0
+    avg_sustainability: float = 0
     items: List[ShoppingListItemResponse]
     
     class Config:
@@ -83,7 +89,31 @@ def get_shopping_list(list_id: int, db: Session = Depends(get_db)):
     if not shopping_list:
         raise HTTPException(status_code=404, detail="Lista no encontrada")
     
-    return shopping_list
+    return {
+        "id": shopping_list.id,
+        "name": shopping_list.name,
+        "budget": shopping_list.budget,
+        "is_optimized": shopping_list.is_optimized,
+        "items": list_item_rows(db, list_id),
+        **list_summary(shopping_list)
+    }
+
+
+@router.get("/{list_id}/summary")
+def get_shopping_list_summary(list_id: int, db: Session = Depends(get_db)):
+
+    shopping_list = db.query(ShoppingList).filter(ShoppingList.id == list_id).first()
+    
+    if not shopping_list:
+        raise HTTPException(status_code=404, detail="Lista no encontrada")
+    
+    return {
+        "id": shopping_list.id,
+        "name": shopping_list.name,
+        "budget": shopping_list.budget,
+        "is_optimized": shopping_list.is_optimized,
+        **list_summary(shopping_list)
+    }
 
 
 @router.post("/{list_id}/items")
@@ -106,8 +136,10 @@ def add_item_to_list(
         ShoppingListItem.product_id == item_data.product_id
     ).first()
     
+    apply_item_delta(shopping_list, product, item_data.quantity)
+
     if existing_item:
-        existing_item.quantity += item_data.quantity
+        existing_item.quantity = ShoppingListItem.quantity + item_data.quantity
         db.commit()
         return {"message": "Cantidad actualizada", "item_id": existing_item.id}
     else:
@@ -137,7 +169,16 @@ def remove_item_from_list(
     if not item:
         raise HTTPException(status_code=404, detail="Item no encontrado")
     
+    product = item.product
     db.delete(item)
+    
+    # Si el producto ya no existe no se conoce su precio, así que se recalcula
+    if product is not None:
+        apply_item_delta(item.shopping_list, product, -item.quantity)
+    else:
+        db.flush()
+        recompute_list_totals(db.connection(), list_id)
+    
     db.commit()
     
     return {"message": "Producto eliminado"}
@@ -154,27 +195,15 @@ def optimize_list(
     if not shopping_list:
         raise HTTPException(status_code=404, detail="Lista no encontrada")
     
-    items = db.query(ShoppingListItem).filter(
-        ShoppingListItem.shopping_list_id == list_id
-    ).all()
+    products = optimizer_product_rows(db, list_id)
     
-    if not items:
+    if not products:
         raise HTTPException(status_code=400, detail="La lista está vacía")
     
-    products = []
-    for item in items:
-        product = item.product
-        products.append({
-            'id': product.id,
-            'name': product.name,
-            'brand': product.brand,
-            'price': product.price,
-            'sustainability_score': product.sustainability_score,
-            'category': product.category,
-            'unit': product.unit
-        })
-    
-    result = product_optimizer(products, optimize_data.budget)
+    if optimize_data.deadline_ms:
+        result = product_optimizer_anytime(products, optimize_data.budget, optimize_data.deadline_ms)
+    else:
+        result = product_optimizer(products, optimize_data.budget)
     
     shopping_list.is_optimized = True
     shopping_list.budget = optimize_data.budget
@@ -0,0 +1,114 @@
+import argparse
+import random
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models import Product
+from app.queries import search_product_rows, listing_product_rows
+
+
+def orm_search(db, q, limit):
+    products = db.query(Product).filter(
+        (Product.name.ilike(f"%{q}%")) |
+        (Product.brand.ilike(f"%{q}%")) |
+        (Product.category.ilike(f"%{q}%"))
+    ).limit(limit).all()
+
+    return [
+        {
+            "id": p.id,
+            "barcode": p.barcode,
+            "name": p.name,
+            "brand": p.brand,
+            "category": p.category,
+            "price": p.price,
+            "unit": p.unit,
+            "sustainability_score": p.sustainability_score,
+            "nutriscore": p.nutriscore,
+            "ecoscore": p.ecoscore,
+            "is_local": p.is_local
+        }
+        for p in products
+    ]
+
+
+def orm_listing(db, category, limit):
+    query = db.query(Product)
+
+    if category:
+        query = query.filter(Product.category == category)
+
+    return [
+        {
+            "id": p.id,
+            "name": p.name,
+            "brand": p.brand,
+            "category": p.category,
+            "price": p.price,
+            "sustainability_score": p.sustainability_score
+        }
+        for p in query.limit(limit).all()
+    ]
+
+
+def seed(db, size):
+    rng = random.Random(42)
+    for i in range(size):
+        db.add(Product(
+            barcode=f"BQ{i:011d}",
+            name=f"Producto {i}",
+            brand=f"Marca {i % 50}",
+            category=rng.choice(["abarrotes", "bebidas", "lacteos", "snacks"]),
+            price=rng.randint(5, 120) * 100,
+            unit="1u",
+            nutriscore="B",
+            ecoscore="C",
+            sustainability_score=round(rng.uniform(20, 95), 1),
+            image_url=f"https://example.com/img/{i}.jpg",
+            description="Descripción de ejemplo del producto. " * 20
+        ))
+    db.commit()
+
+
+def measure(session_factory, fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        db = session_factory()
+        start = time.perf_counter()
+        rows = fn(db)
+        timings.append(time.perf_counter() - start)
+        db.close()
+    timings.sort()
+    return timings[len(timings) // 2] * 1000, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara lectura ORM vs proyección de columnas")
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=1000, help="filas por página")
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = session_factory()
+    seed(db, args.products)
+    db.close()
+
+    cases = [
+        ("listado", orm_listing, listing_product_rows, (None, args.limit)),
+        ("búsqueda", orm_search, search_product_rows, ("producto", args.limit)),
+    ]
+
+    print(f"{args.products} productos, {args.limit} filas por página (mediana de {args.repeat})")
+    for name, orm_fn, projection_fn, params in cases:
+        orm_ms, rows = measure(session_factory, lambda db: orm_fn(db, *params), args.repeat)
+        projection_ms, _ = measure(session_factory, lambda db: projection_fn(db, *params), args.repeat)
+        print(f"{name:<10} filas={rows:<6} ORM {orm_ms:8.2f} ms   proyección {projection_ms:8.2f} ms   x{orm_ms / projection_ms:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,12 @@ import json
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine, Base
 from app.models import Product
+from app.list_totals import migrate_list_totals, recompute_list_totals
+from app.algorithms.autocomplete import install_catalog_version
 
 Base.metadata.create_all(bind=engine)
+migrate_list_totals(engine)
+install_catalog_version(engine)
 
 def load_products():
     db = SessionLocal()
@@ -17,6 +21,9 @@ def load_products():
         product = Product(**product_data)
         db.add(product)
     
+    # El borrado masivo no pasa por los eventos del ORM
+    db.flush()
+    recompute_list_totals(db.connection())
     db.commit()
     db.close()
 if __name__ == "__main__":
@@ -0,0 +1,316 @@
+import argparse
+import asyncio
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+import httpx
+
+SYNTHETIC_PREFIX = "LT"
+
+NAMES = [
+    "Leche", "Yogur", "Queso", "Pan", "Arroz", "Fideos", "Aceite", "Azúcar",
+    "Café", "Té", "Manzana", "Plátano", "Tomate", "Lechuga", "Pollo", "Salmón",
+    "Jugo", "Galletas", "Mantequilla", "Harina", "Porotos", "Lentejas", "Atún", "Cereal"
+]
+VARIANTS = ["Entera", "Descremada", "Integral", "Orgánico", "Natural", "Light", "Premium", "Familiar"]
+BRANDS = ["Colun", "Soprole", "Carozzi", "Lucchetti", "Tucapel", "Ideal", "Nestlé", "Watts", "Agrosuper", "Líder"]
+CATEGORIES = ["abarrotes", "bebidas", "carnes", "congelados", "frutas", "lacteos", "panaderia", "pescados", "snacks", "verduras"]
+SCORES = ["A", "B", "C", "D", "E"]
+
+DEFAULT_MIX = "search=2,typeahead=4,barcode=2,list=2,optimize=1"
+
+
+# Los módulos de app se importan tarde para que DATABASE_URL ya apunte
+# a la base temporal cuando la app corre en proceso
+def seed_catalog(size, rng):
+    from app.database import SessionLocal, engine, Base
+    from app.models import Product
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+
+    try:
+        barcodes = [
+            b for (b,) in db.query(Product.barcode).filter(
+                Product.barcode.like(f"{SYNTHETIC_PREFIX}%")
+            ).all()
+        ]
+
+        for i in range(len(barcodes), size):
+            name = rng.choice(NAMES)
+            brand = rng.choice(BRANDS)
+            db.add(Product(
+                barcode=f"{SYNTHETIC_PREFIX}{i:011d}",
+                name=f"{name} {rng.choice(VARIANTS)} {brand} {i}",
+                brand=brand,
+                category=rng.choice(CATEGORIES),
+                price=rng.randint(5, 120) * 100,
+                unit="1u",
+                nutriscore=rng.choice(SCORES),
+                ecoscore=rng.choice(SCORES),
+                sustainability_score=round(rng.uniform(20, 95), 1),
+                carbon_footprint=round(rng.uniform(0.2, 8), 1),
+                is_local=rng.random() < 0.4,
+                is_organic=rng.random() < 0.2,
+                is_fair_trade=rng.random() < 0.1
+            ))
+
+        db.commit()
+
+        return db.query(Product.id, Product.barcode, Product.name).filter(
+            Product.barcode.like(f"{SYNTHETIC_PREFIX}%")
+        ).limit(size).all()
+
+    finally:
+        db.close()
+
+
+async def seed_lists(client, catalog, count, rng):
+    list_ids = []
+    for _ in range(count):
+        response = await client.post("/shopping-lists", json={"name": "Lista de carga"})
+        list_id = response.json()["id"]
+        for product in rng.sample(catalog, min(len(catalog), rng.randint(10, 30))):
+            await client.post(
+                f"/shopping-lists/{list_id}/items",
+                json={"product_id": product.id, "quantity": rng.randint(1, 3)}
+            )
+        list_ids.append(list_id)
+
+    return list_ids
+
+
+def remove_seeded_rows(list_ids):
+    from app.database import SessionLocal
+    from app.models import Product, ShoppingList, ShoppingListItem
+
+    db = SessionLocal()
+
+    try:
+        is_synthetic = Product.barcode.like(f"{SYNTHETIC_PREFIX}%")
+        db.query(ShoppingListItem).filter(
+            ShoppingListItem.shopping_list_id.in_(list_ids) |
+            ShoppingListItem.product_id.in_(db.query(Product.id).filter(is_synthetic).scalar_subquery())
+        ).delete(synchronize_session=False)
+        db.query(ShoppingList).filter(ShoppingList.id.in_(list_ids)).delete(synchronize_session=False)
+        db.query(Product).filter(is_synthetic).delete(synchronize_session=False)
+        db.commit()
+
+    finally:
+        db.close()
+
+
+class Recorder:
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    async def request(self, client, endpoint, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            failed = response.status_code >= 400 or (isinstance(body, dict) and "error" in body)
+        except httpx.HTTPError:
+            response = None
+            failed = True
+        elapsed = (time.perf_counter() - start) * 1000
+
+        self.latencies.setdefault(endpoint, []).append(elapsed)
+        if failed:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+        return response
+
+
+async def search_burst(client, recorder, ctx, rng):
+    word = rng.choice(ctx["catalog"]).name.split()[0]
+    for i in range(1, len(word) + 1):
+        await recorder.request(client, "GET /products/search", "GET", "/products/search", params={"q": word[:i]})
+        await asyncio.sleep(rng.uniform(0.03, 0.12) * ctx["think"])
+
+
+async def typeahead_burst(client, recorder, ctx, rng):
+    word = rng.choice(ctx["catalog"]).name.split()[0]
+    for i in range(1, len(word) + 1):
+        await recorder.request(client, "GET /products/autocomplete", "GET", "/products/autocomplete", params={"q": word[:i]})
+        await asyncio.sleep(rng.uniform(0.03, 0.12) * ctx["think"])
+
+
+async def barcode_scan(client, recorder, ctx, rng):
+    product = rng.choice(ctx["catalog"])
+    await recorder.request(client, "GET /products/barcode/{barcode}", "GET", f"/products/barcode/{product.barcode}")
+    await recorder.request(client, "GET /products/{id}", "GET", f"/products/{product.id}")
+
+
+async def build_list(client, recorder, ctx, rng):
+    response = await recorder.request(client, "POST /shopping-lists", "POST", "/shopping-lists", json={"name": "Lista de carga"})
+    if response is None or response.status_code >= 400:
+        return
+    list_id = response.json()["id"]
+    ctx["created_lists"].append(list_id)
+
+    for product in rng.sample(ctx["catalog"], min(len(ctx["catalog"]), rng.randint(3, 8))):
+        await recorder.request(
+            client, "POST /shopping-lists/{id}/items", "POST", f"/shopping-lists/{list_id}/items",
+            json={"product_id": product.id, "quantity": rng.randint(1, 3)}
+        )
+        await asyncio.sleep(rng.uniform(0.1, 0.4) * ctx["think"])
+
+    await recorder.request(client, "GET /shopping-lists/{id}", "GET", f"/shopping-lists/{list_id}")
+
+
+async def optimize(client, recorder, ctx, rng):
+    if not ctx["list_ids"]:
+        return
+    payload = {"budget": rng.randint(50, 400) * 100}
+    if ctx["deadline_ms"]:
+        payload["deadline_ms"] = ctx["deadline_ms"]
+    list_id = rng.choice(ctx["list_ids"])
+    await recorder.request(client, "POST /shopping-lists/{id}/optimize", "POST", f"/shopping-lists/{list_id}/optimize", json=payload)
+
+
+SCENARIOS = {
+    "search": search_burst,
+    "typeahead": typeahead_burst,
+    "barcode": barcode_scan,
+    "list": build_list,
+    "optimize": optimize,
+}
+
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(","):
+        name, weight = part.split("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Escenario desconocido: {name}")
+        weights[name] = float(weight)
+    return weights
+
+
+async def virtual_user(client, recorder, ctx, weights, stop_at, rng):
+    names = list(weights)
+    values = [weights[n] for n in names]
+    while time.perf_counter() < stop_at:
+        scenario = rng.choices(names, weights=values)[0]
+        await SCENARIOS[scenario](client, recorder, ctx, rng)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def report(recorder, elapsed, concurrency):
+    print(f"\nConcurrencia: {concurrency}  Duración: {elapsed:.1f}s")
+    print(f"{'endpoint':<36}{'reqs':>8}{'err':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+
+    total = 0
+    all_latencies = []
+    for endpoint in sorted(recorder.latencies):
+        values = sorted(recorder.latencies[endpoint])
+        total += len(values)
+        all_latencies.extend(values)
+        print(
+            f"{endpoint:<36}{len(values):>8}{recorder.errors.get(endpoint, 0):>6}"
+            f"{len(values) / elapsed:>9.1f}{percentile(values, 50):>9.1f}"
+            f"{percentile(values, 95):>9.1f}{percentile(values, 99):>9.1f}"
+        )
+
+    all_latencies.sort()
+    errors = sum(recorder.errors.values())
+    print(
+        f"{'TOTAL':<36}{total:>8}{errors:>6}{total / elapsed:>9.1f}"
+        f"{percentile(all_latencies, 50):>9.1f}{percentile(all_latencies, 95):>9.1f}"
+        f"{percentile(all_latencies, 99):>9.1f}"
+    )
+
+
+def make_client(url):
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=30)
+
+    # Las excepciones de la app se reportan como 500 en vez de cortar la corrida
+    from app.main import app
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30)
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    weights = parse_mix(args.mix)
+    catalog = seed_catalog(args.products, rng)
+
+    ctx = {
+        "catalog": catalog,
+        "list_ids": [],
+        "created_lists": [],
+        "deadline_ms": args.deadline_ms,
+        "think": args.think,
+    }
+
+    try:
+        async with make_client(args.url) as client:
+            ctx["list_ids"] = await seed_lists(client, catalog, args.lists, rng)
+
+            recorder = Recorder()
+            start = time.perf_counter()
+            stop_at = start + args.duration
+            await asyncio.gather(*[
+                virtual_user(client, recorder, ctx, weights, stop_at, random.Random(args.seed + i + 1))
+                for i in range(args.concurrency)
+            ])
+            elapsed = time.perf_counter() - start
+
+    finally:
+        # Contra un servidor real se borra lo sembrado de su base
+        if args.url:
+            remove_seeded_rows(ctx["list_ids"] + ctx["created_lists"])
+
+    report(recorder, elapsed, args.concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga HTTP de la API LiquiVerde")
+    parser.add_argument("--url", default=None, help="URL de un uvicorn local que use la misma base SQLite (lo sembrado se borra al terminar); por defecto la app corre en proceso sobre una base temporal")
+    parser.add_argument("--concurrency", type=int, default=10, help="usuarios virtuales simultáneos")
+    parser.add_argument("--duration", type=float, default=30, help="segundos de carga")
+    parser.add_argument("--products", type=int, default=2000, help="productos sintéticos a sembrar")
+    parser.add_argument("--lists", type=int, default=20, help="listas sembradas para optimizar")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="pesos de escenarios, ej. " + DEFAULT_MIX)
+    parser.add_argument("--deadline-ms", type=int, default=None, help="deadline_ms enviado al optimizador")
+    parser.add_argument("--think", type=float, default=1.0, help="factor del tiempo de espera entre acciones (0 = sin pausas)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    try:
+        weights = parse_mix(args.mix)
+    except ValueError as error:
+        parser.error(f"--mix inválido: {error}")
+    if weights.get("optimize", 0) > 0 and args.lists < 1:
+        parser.error("el escenario optimize necesita al menos una lista sembrada (--lists >= 1)")
+
+    if args.url:
+        asyncio.run(run(args))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="liquiverde-load-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'load_test.db')}"
+    try:
+        asyncio.run(run(args))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()